@@ -9,15 +9,27 @@ Endpoints:
     POST /api/export         — upload one or more PDFs, returns an Excel file
 """
 
+import asyncio
+import hashlib
+import heapq
 import logging
-from typing import List
-
-from fastapi import FastAPI, File, HTTPException, UploadFile
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from functools import partial
+from operator import attrgetter
+from typing import Dict, Iterator, List, Tuple
+
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+from starlette.datastructures import State
 
-from app.parser.parse_statements import parse_from_bytes
+from app.parser.parse_statements import Transaction, parse_from_bytes
 from app.parser.export_excel import export
 
 # ─── LOGGING ──────────────────────────────────────────────────────────────────
@@ -25,9 +37,75 @@ from app.parser.export_excel import export
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
 
+# ─── WORKERS ──────────────────────────────────────────────────────────────────
+
+# PDF parsing is CPU-bound, so each file is parsed in a worker process instead
+# of on the event loop. The pool and the semaphore capping how many PDFs are in
+# flight at once live on app.state and are created per lifespan (see lifespan).
+_CPU_COUNT     = os.cpu_count() or 1
+_MAX_IN_FLIGHT = min(_CPU_COUNT, 8)
+
+# Uploads are checked and hashed in chunks of this size. Starlette already
+# spools each upload to disk past 1 MiB, so that file is the only copy until a
+# worker slot frees up and its bytes are read for the parse.
+_READ_CHUNK = 1 << 20
+
+# The Excel download is streamed back to the client in chunks of this size
+_STREAM_CHUNK = 64 << 10
+
+# Parsed results keyed by a hash of the PDF content, so re-uploading the same
+# statement (e.g. for JSON and then Excel) skips the parse entirely. The
+# per-key locks make concurrent uploads of one file wait for a single parse.
+_CACHE_SIZE = 128
+_cache: "OrderedDict[bytes, List[Transaction]]" = OrderedDict()
+_cache_locks: Dict[bytes, asyncio.Lock] = {}
+
+_BY_DATE = attrgetter("date")
+
+
+def _pool_failure(state: State, executor: ProcessPoolExecutor, filename: str,
+                  exc: RuntimeError) -> HTTPException:
+    """
+    Map a worker pool failure to a 503: it is a server fault, not the file's.
+
+    A worker dying (e.g. OOM-killed) leaves a ProcessPoolExecutor permanently
+    broken, so a fresh pool is swapped in. Concurrent failures all report the
+    same broken pool, so only the first one replaces it.
+    """
+    log.error(f"Worker pool failed while parsing {filename!r}", exc_info=exc)
+    if isinstance(exc, BrokenProcessPool) and state.executor is executor:
+        state.executor = ProcessPoolExecutor(max_workers=_CPU_COUNT)
+        executor.shutdown(wait=False, cancel_futures=True)
+    return HTTPException(status_code=503, detail="PDF parser is temporarily unavailable; please retry.")
+
 # ─── APP ──────────────────────────────────────────────────────────────────────
 
-app = FastAPI(title="RBC Statement Parser", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Created here rather than at import so every startup gets a live pool and
+    # a semaphore bound to the running event loop
+    app.state.executor  = ProcessPoolExecutor(max_workers=_CPU_COUNT)
+    app.state.parse_sem = asyncio.Semaphore(_MAX_IN_FLIGHT)
+    try:
+        yield
+    finally:
+        app.state.executor.shutdown(cancel_futures=True)
+
+
+class _JSONGZipMiddleware(GZipMiddleware):
+    """
+    Gzip responses over minimum_size, except /api/export: an .xlsx is already
+    a zip archive, so compressing it again only burns CPU.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/api/export":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app = FastAPI(title="RBC Statement Parser", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -36,6 +114,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Transaction JSON repeats the same dates, categories and merchants on every
+# row, so it typically compresses 5–10×.
+app.add_middleware(_JSONGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # ─── SCHEMAS ──────────────────────────────────────────────────────────────────
 
 class TransactionOut(BaseModel):
@@ -57,19 +139,105 @@ class ParseResponse(BaseModel):
 
 # ─── HELPERS ──────────────────────────────────────────────────────────────────
 
-async def _read_pdfs(files: List[UploadFile]):
-    """Read uploaded files and return list of (bytes, filename) tuples."""
+async def _read_pdfs(files: List[UploadFile]) -> List[Tuple[UploadFile, str, bytes]]:
+    """
+    Validate and hash each upload in one streaming pass, then rewind it; the
+    parse reads it again later. Returns list of (upload, filename, content
+    digest) tuples.
+    """
     results = []
     for f in files:
         if not f.filename or not f.filename.lower().endswith(".pdf"):
             raise HTTPException(status_code=400, detail=f"Only PDF files are accepted, got: {f.filename!r}")
-        data = await f.read()
-        if not data:
+        digest = hashlib.blake2b(digest_size=16)
+        chunk  = await f.read(_READ_CHUNK)
+        if not chunk:
             raise HTTPException(status_code=400, detail=f"Uploaded file is empty: {f.filename!r}")
-        results.append((data, f.filename))
+        # Reject non-PDFs from the first chunk, before they cost a worker parse
+        if not chunk.startswith(b"%PDF-"):
+            raise HTTPException(status_code=400, detail=f"Not a valid PDF file: {f.filename!r}")
+        while chunk:
+            digest.update(chunk)
+            chunk = await f.read(_READ_CHUNK)
+        await f.seek(0)
+        results.append((f, f.filename, digest.digest()))
     return results
 
 
+def _parse_sorted(pdf_bytes: bytes, filename: str) -> List[Transaction]:
+    """Worker entry point: parse one PDF and return its transactions in date order."""
+    txns = parse_from_bytes(pdf_bytes, filename)
+    txns.sort(key=_BY_DATE)   # statements are already chronological, so this is a single pass
+    return txns
+
+
+async def _parse_one(state: State, upload: UploadFile, filename: str, key: bytes) -> List[Transaction]:
+    """
+    Parse a single PDF in the worker pool once a semaphore slot is free,
+    or return the cached result for identical content.
+
+    Raises HTTPException 503 if the worker pool fails (see _pool_failure).
+    """
+    lock = _cache_locks.setdefault(key, asyncio.Lock())
+    try:
+        async with lock:
+            txns = _cache.get(key)
+            if txns is not None:
+                log.info(f"Cache hit for {filename!r}")
+            else:
+                loop = asyncio.get_running_loop()
+                async with state.parse_sem:
+                    # The worker needs the raw bytes, so only read them once a slot is
+                    # free — at most the semaphore's limit of PDFs is held in memory.
+                    pdf_bytes = await upload.read()
+                    executor  = state.executor
+                    try:
+                        # Submitting only fails for pool reasons: broken or shut down
+                        fut = loop.run_in_executor(executor, _parse_sorted, pdf_bytes, filename)
+                    except RuntimeError as e:
+                        raise _pool_failure(state, executor, filename, e) from e
+                    try:
+                        txns = await fut
+                    except BrokenProcessPool as e:
+                        raise _pool_failure(state, executor, filename, e) from e
+                _cache[key] = txns
+                while len(_cache) > _CACHE_SIZE:
+                    _cache.popitem(last=False)
+            _cache.move_to_end(key)
+    finally:
+        if not lock.locked() and _cache_locks.get(key) is lock:
+            del _cache_locks[key]
+    return txns
+
+
+async def _collect_transactions(state: State, files: List[UploadFile]) -> Iterator[Transaction]:
+    """
+    Read, validate and parse every uploaded PDF concurrently.
+    Returns a lazy iterator over all transactions in chronological order
+    across statements; consume it once.
+    """
+    pdf_data = await _read_pdfs(files)
+    results  = await asyncio.gather(
+        *(_parse_one(state, upload, filename, key) for upload, filename, key in pdf_data),
+        return_exceptions=True,
+    )
+
+    per_file = []
+    for (_, filename, _), txns in zip(pdf_data, results):
+        if isinstance(txns, HTTPException):
+            raise txns   # already mapped to a status, e.g. 503 for a pool failure
+        if isinstance(txns, Exception):
+            # Raised by the parser itself, so the file is at fault
+            log.error(f"Failed to parse {filename!r}", exc_info=txns)
+            raise HTTPException(status_code=422, detail=f"Failed to parse {filename!r}: {txns}")
+        if isinstance(txns, BaseException):
+            raise txns   # cancellation: not a parse failure
+        per_file.append(txns)
+
+    # Each file is already in date order; merge chronologically across statements
+    return heapq.merge(*per_file, key=_BY_DATE)
+
+
 # ─── ROUTES ───────────────────────────────────────────────────────────────────
 
 @app.get("/api/health")
@@ -77,8 +245,8 @@ def health():
     return {"status": "ok"}
 
 
-@app.post("/api/parse", response_model=ParseResponse)
-async def parse(files: List[UploadFile] = File(...)):
+@app.post("/api/parse", response_model=ParseResponse, response_class=ORJSONResponse)
+async def parse(request: Request, files: List[UploadFile] = File(...)):
     """
     Upload one or more RBC PDF statements.
     Returns all transactions as JSON.
@@ -86,40 +254,31 @@ async def parse(files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="At least one PDF file is required.")
 
-    pdf_data = await _read_pdfs(files)
-    all_transactions = []
-
-    for pdf_bytes, filename in pdf_data:
-        try:
-            txns = parse_from_bytes(pdf_bytes, filename)
-            all_transactions.extend(txns)
-        except Exception as e:
-            log.exception(f"Failed to parse {filename!r}")
-            raise HTTPException(status_code=422, detail=f"Failed to parse {filename!r}: {e}")
-
-    # Sort chronologically across all statements
-    all_transactions.sort(key=lambda t: t.date)
+    transactions = await _collect_transactions(request.app.state, files)
 
+    # ParseResponse documents the shape; the parser's output is already typed,
+    # so plain dicts go straight to orjson instead of being re-validated.
     out = [
-        TransactionOut(
-            date             = t.date.isoformat(),
-            type_line        = t.type_line,
-            merchant         = t.merchant,
-            direction        = t.direction,
-            amount           = float(t.amount),
-            balance          = float(t.balance) if t.balance is not None else None,
-            category         = t.category,
-            description      = t.description,
-            statement_period = t.statement_period,
-        )
-        for t in all_transactions
+        {
+            "date":             date_iso,
+            "type_line":        type_line,
+            "merchant":         merchant,
+            "direction":        direction,
+            "amount":           amount_cents / 100,
+            "balance":          balance_cents / 100 if balance_cents is not None else None,
+            "category":         category,
+            "description":      description,
+            "statement_period": period,
+        }
+        for (date_iso, description, type_line, merchant, direction,
+             amount_cents, balance_cents, category, period) in map(Transaction.as_tuple, transactions)
     ]
 
-    return ParseResponse(count=len(out), transactions=out)
+    return ORJSONResponse({"count": len(out), "transactions": out})
 
 
 @app.post("/api/export")
-async def export_excel(files: List[UploadFile] = File(...)):
+async def export_excel(request: Request, files: List[UploadFile] = File(...)):
     """
     Upload one or more RBC PDF statements.
     Returns a formatted Excel workbook as a file download.
@@ -127,27 +286,23 @@ async def export_excel(files: List[UploadFile] = File(...)):
     if not files:
         raise HTTPException(status_code=400, detail="At least one PDF file is required.")
 
-    pdf_data = await _read_pdfs(files)
-    all_transactions = []
-
-    for pdf_bytes, filename in pdf_data:
-        try:
-            txns = parse_from_bytes(pdf_bytes, filename)
-            all_transactions.extend(txns)
-        except Exception as e:
-            log.exception(f"Failed to parse {filename!r}")
-            raise HTTPException(status_code=422, detail=f"Failed to parse {filename!r}: {e}")
-
-    all_transactions.sort(key=lambda t: t.date)
+    transactions = await _collect_transactions(request.app.state, files)
 
     try:
-        xlsx_bytes = export(all_transactions)
+        # Building the workbook is CPU-bound too; keep it off the event loop.
+        # The merged transactions stream straight into the sheet rows.
+        xlsx_buf = await asyncio.to_thread(export, transactions)
     except Exception as e:
         log.exception("Excel export failed")
         raise HTTPException(status_code=500, detail=f"Excel export failed: {e}")
 
-    return Response(
-        content=xlsx_bytes,
+    # Stream straight out of the export buffer rather than copying it into a
+    # Response body, so the workbook is only resident once.
+    return StreamingResponse(
+        iter(partial(xlsx_buf.read, _STREAM_CHUNK), b""),
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=rbc_transactions.xlsx"},
+        headers={
+            "Content-Disposition": "attachment; filename=rbc_transactions.xlsx",
+            "Content-Length":      str(xlsx_buf.getbuffer().nbytes),
+        },
     )
@@ -6,38 +6,69 @@ Writes a list of Transaction objects to a formatted Excel workbook.
 
 Sheet 1 — "Transactions": every transaction, one row each
 Sheet 2 — "Summary by Category": totals grouped by category
+
+Uses xlsxwriter in constant_memory mode: rows are streamed out as they are
+written and every cell style is a format object registered once per workbook.
 """
 
-from collections import defaultdict
-from decimal import Decimal
+import io
+from dataclasses import dataclass, field
+from operator import attrgetter
 from pathlib import Path
-from typing import List
+from typing import Iterable, Iterator
 
-import openpyxl
-from openpyxl.styles import PatternFill, Font, Alignment
-from openpyxl.utils import get_column_letter
+import xlsxwriter
 
 from app.parser.parse_statements import Transaction
 
 # ─── STYLES ───────────────────────────────────────────────────────────────────
 
-HEADER_FILL     = PatternFill("solid", fgColor="1F3864")
-HEADER_FONT     = Font(bold=True, color="FFFFFF", size=11)
-ROW_FILL_ODD    = PatternFill("solid", fgColor="FFFFFF")
-ROW_FILL_EVEN   = PatternFill("solid", fgColor="DCE6F1")
-WITHDRAWAL_FONT = Font(color="C00000")           # dark red
-DEPOSIT_FONT    = Font(color="375623")           # dark green
-GRAND_FILL      = PatternFill("solid", fgColor="1F3864")
-GRAND_FONT      = Font(bold=True, color="FFFFFF")
-
-CURRENCY_FMT = '$#,##0.00'
-DATE_FMT     = 'DD-MMM-YYYY'
+# Format properties; combined and registered with each workbook via _fmt().
+HEADER_FILL     = {"bg_color": "#1F3864"}
+HEADER_FONT     = {"bold": True, "font_color": "#FFFFFF", "font_size": 11}
+ROW_FILL_ODD    = {"bg_color": "#FFFFFF"}
+ROW_FILL_EVEN   = {"bg_color": "#DCE6F1"}
+WITHDRAWAL_FONT = {"font_color": "#C00000"}           # dark red
+DEPOSIT_FONT    = {"font_color": "#375623"}           # dark green
+GRAND_FILL      = {"bg_color": "#1F3864"}
+GRAND_FONT      = {"bold": True, "font_color": "#FFFFFF"}
+
+ALIGN_LEFT   = {"align": "left"}
+ALIGN_CENTER = {"align": "center"}
+ALIGN_RIGHT  = {"align": "right"}
+
+CURRENCY_FMT = {"num_format": '$#,##0.00'}
+DATE_FMT     = {"num_format": 'DD-MMM-YYYY'}
+
+
+def _fmt(wb: xlsxwriter.Workbook, *styles: dict):
+    """Merge style dicts into a single workbook format."""
+    props = {}
+    for style in styles:
+        props.update(style)
+    return wb.add_format(props)
+
+
+def _row_formats(wb: xlsxwriter.Workbook, fill: dict) -> dict:
+    """Every cell format used by one stripe (odd/even) of the data rows."""
+    return {
+        "date":       _fmt(wb, fill, DATE_FMT, ALIGN_CENTER),
+        "center":     _fmt(wb, fill, ALIGN_CENTER),
+        "left":       _fmt(wb, fill, ALIGN_LEFT),
+        "right":      _fmt(wb, fill, ALIGN_RIGHT),
+        "currency":   _fmt(wb, fill, CURRENCY_FMT, ALIGN_RIGHT),
+        "withdrawal": _fmt(wb, fill, CURRENCY_FMT, WITHDRAWAL_FONT, ALIGN_RIGHT),
+        "deposit":    _fmt(wb, fill, CURRENCY_FMT, DEPOSIT_FONT, ALIGN_RIGHT),
+    }
 
 # ─── TRANSACTIONS SHEET ───────────────────────────────────────────────────────
 
-def write_transactions_sheet(wb: openpyxl.Workbook, transactions: List[Transaction]):
-    ws = wb.active
-    ws.title = "Transactions"
+# Fetches every field a data row needs in one C-level call, in column order
+_ROW_FIELDS = attrgetter("date", "direction", "amount_cents", "category",
+                         "description", "merchant", "statement_period", "balance_cents")
+
+def write_transactions_sheet(wb: xlsxwriter.Workbook, transactions: Iterable[Transaction]):
+    ws = wb.add_worksheet("Transactions")
 
     headers    = ["Date", "Type", "Amount", "Category",
                   "Description", "Merchant", "Statement Period", "Balance"]
@@ -45,137 +76,151 @@ def write_transactions_sheet(wb: openpyxl.Workbook, transactions: List[Transacti
                   58,           32,          26,                  14]
 
     # ── Header row ──
-    for col_idx, (header, width) in enumerate(zip(headers, col_widths), start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill      = HEADER_FILL
-        cell.font      = HEADER_FONT
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.column_dimensions[get_column_letter(col_idx)].width = width
+    header_fmt = _fmt(wb, HEADER_FILL, HEADER_FONT, ALIGN_CENTER, {"valign": "vcenter"})
+    for col_idx, width in enumerate(col_widths):
+        ws.set_column(col_idx, col_idx, width)
 
-    ws.row_dimensions[1].height = 22
-    ws.freeze_panes = "A2"
-    ws.auto_filter.ref = f"A1:{get_column_letter(len(headers))}1"
+    ws.set_row(0, 22)
+    ws.write_row(0, 0, headers, header_fmt)
+    ws.freeze_panes(1, 0)
+    ws.autofilter(0, 0, 0, len(headers) - 1)
 
     # ── Data rows ──
-    for row_idx, t in enumerate(transactions, start=2):
-        fill        = ROW_FILL_EVEN if row_idx % 2 == 0 else ROW_FILL_ODD
-        amount_font = WITHDRAWAL_FONT if t.direction == "Withdrawal" else DEPOSIT_FONT
-
-        def c(col, value, fmt=None, font=None, align="left"):
-            cell = ws.cell(row=row_idx, column=col, value=value)
-            cell.fill = fill
-            if fmt:
-                cell.number_format = fmt
-            if font:
-                cell.font = font
-            cell.alignment = Alignment(horizontal=align)
-            return cell
-
-        c(1, t.date,                                  fmt=DATE_FMT,     align="center")
-        c(2, t.direction,                                                align="center")
-        c(3, float(t.amount),             fmt=CURRENCY_FMT, font=amount_font, align="right")
-        c(4, t.category)
-        c(5, t.description)
-        c(6, t.merchant)
-        c(7, t.statement_period,                                         align="center")
-        c(8, float(t.balance) if t.balance is not None else None,
-              fmt=CURRENCY_FMT if t.balance is not None else None,       align="right")
+    # Indexed by row % 2: 0-based odd rows are the even rows Excel displays
+    stripes = (_row_formats(wb, ROW_FILL_ODD), _row_formats(wb, ROW_FILL_EVEN))
+
+    # Typed write_*() calls skip write()'s per-cell type sniffing, which would
+    # also turn a description starting with "=" into a formula.
+    for row_idx, t in enumerate(transactions, start=1):
+        date, direction, amount, category, description, merchant, period, balance = _ROW_FIELDS(t)
+        f = stripes[row_idx % 2]
+
+        ws.write_datetime(row_idx, 0, date,             f["date"])
+        ws.write_string(row_idx, 1, direction,          f["center"])
+        ws.write_number(row_idx, 2, amount / 100,
+                        f["withdrawal"] if direction == "Withdrawal" else f["deposit"])
+        ws.write_string(row_idx, 3, category,           f["left"])
+        ws.write_string(row_idx, 4, description,        f["left"])
+        ws.write_string(row_idx, 5, merchant,           f["left"])
+        ws.write_string(row_idx, 6, period,             f["center"])
+        if balance is not None:
+            ws.write_number(row_idx, 7, balance / 100,  f["currency"])
+        else:
+            ws.write_blank(row_idx, 7, None,            f["right"])
 
 
-# ─── SUMMARY SHEET ────────────────────────────────────────────────────────────
+# ─── AGGREGATION ──────────────────────────────────────────────────────────────
 
-def write_summary_sheet(wb: openpyxl.Workbook, transactions: List[Transaction]):
-    ws = wb.create_sheet("Summary by Category")
+@dataclass
+class CategoryTotals:
+    """Per-category totals, in integer cents like Transaction.amount_cents."""
+    withdrawals: dict[str, int] = field(default_factory=dict)
+    deposits:    dict[str, int] = field(default_factory=dict)
+    counts:      dict[str, int] = field(default_factory=dict)
 
-    headers    = ["Category", "Total Withdrawals", "Total Deposits", "Net", "# Transactions"]
-    col_widths = [26,          22,                  22,               22,    18]
+    def tally(self, transactions: Iterable[Transaction]) -> Iterator[Transaction]:
+        """Pass transactions through unchanged, adding each one to the totals."""
+        withdrawals, deposits, counts = self.withdrawals, self.deposits, self.counts
+        for t in transactions:
+            cat   = t.category
+            cents = t.amount_cents
+            counts[cat] = counts.get(cat, 0) + 1
+            if t.direction == "Withdrawal":
+                withdrawals[cat] = withdrawals.get(cat, 0) + cents
+            else:
+                deposits[cat] = deposits.get(cat, 0) + cents
+            yield t
 
-    for col_idx, (header, width) in enumerate(zip(headers, col_widths), start=1):
-        cell = ws.cell(row=1, column=col_idx, value=header)
-        cell.fill      = HEADER_FILL
-        cell.font      = HEADER_FONT
-        cell.alignment = Alignment(horizontal="center")
-        ws.column_dimensions[get_column_letter(col_idx)].width = width
-
-    ws.row_dimensions[1].height = 22
-    ws.freeze_panes = "A2"
-
-    # ── Aggregate ──
-    summary = defaultdict(lambda: {"withdrawals": Decimal(0), "deposits": Decimal(0), "count": 0})
-    for t in transactions:
-        entry = summary[t.category]
-        entry["count"] += 1
-        if t.direction == "Withdrawal":
-            entry["withdrawals"] += t.amount
-        else:
-            entry["deposits"] += t.amount
 
-    sorted_cats = sorted(summary.items(), key=lambda x: x[1]["withdrawals"], reverse=True)
-
-    for row_idx, (cat, data) in enumerate(sorted_cats, start=2):
-        fill = ROW_FILL_EVEN if row_idx % 2 == 0 else ROW_FILL_ODD
-        net  = data["deposits"] - data["withdrawals"]
+# ─── SUMMARY SHEET ────────────────────────────────────────────────────────────
 
-        ws.cell(row=row_idx, column=1, value=cat).fill = fill
+def write_summary_sheet(wb: xlsxwriter.Workbook, totals: CategoryTotals):
+    ws = wb.add_worksheet("Summary by Category")
 
-        for col_idx, (val, font) in enumerate([
-            (float(data["withdrawals"]), WITHDRAWAL_FONT),
-            (float(data["deposits"]),   DEPOSIT_FONT),
-            (float(net),                DEPOSIT_FONT if net >= 0 else WITHDRAWAL_FONT),
-        ], start=2):
-            cell = ws.cell(row=row_idx, column=col_idx, value=val)
-            cell.number_format = CURRENCY_FMT
-            cell.font  = font
-            cell.fill  = fill
-            cell.alignment = Alignment(horizontal="right")
+    headers    = ["Category", "Total Withdrawals", "Total Deposits", "Net", "# Transactions"]
+    col_widths = [26,          22,                  22,               22,    18]
 
-        cnt = ws.cell(row=row_idx, column=5, value=data["count"])
-        cnt.fill      = fill
-        cnt.alignment = Alignment(horizontal="center")
+    header_fmt = _fmt(wb, HEADER_FILL, HEADER_FONT, ALIGN_CENTER)
+    for col_idx, width in enumerate(col_widths):
+        ws.set_column(col_idx, col_idx, width)
+
+    ws.set_row(0, 22)
+    ws.write_row(0, 0, headers, header_fmt)
+    ws.freeze_panes(1, 0)
+
+    withdrawals, deposits, counts = totals.withdrawals, totals.deposits, totals.counts
+    sorted_cats = sorted(counts, key=lambda cat: withdrawals.get(cat, 0), reverse=True)
+
+    stripes = tuple(
+        {
+            "cat":        _fmt(wb, fill),
+            "withdrawal": _fmt(wb, fill, CURRENCY_FMT, WITHDRAWAL_FONT, ALIGN_RIGHT),
+            "deposit":    _fmt(wb, fill, CURRENCY_FMT, DEPOSIT_FONT, ALIGN_RIGHT),
+            "count":      _fmt(wb, fill, ALIGN_CENTER),
+        }
+        for fill in (ROW_FILL_ODD, ROW_FILL_EVEN)
+    )
+
+    for row_idx, cat in enumerate(sorted_cats, start=1):
+        f   = stripes[row_idx % 2]
+        w   = withdrawals.get(cat, 0)
+        d   = deposits.get(cat, 0)
+        net = d - w
+
+        ws.write_string(row_idx, 0, cat,          f["cat"])
+        ws.write_number(row_idx, 1, w / 100,      f["withdrawal"])
+        ws.write_number(row_idx, 2, d / 100,      f["deposit"])
+        ws.write_number(row_idx, 3, net / 100,    f["deposit"] if net >= 0 else f["withdrawal"])
+        ws.write_number(row_idx, 4, counts[cat],  f["count"])
 
     # ── Grand total row ──
-    total_row = len(sorted_cats) + 2
-    total_w   = sum(d["withdrawals"] for d in summary.values())
-    total_d   = sum(d["deposits"]    for d in summary.values())
+    total_row = len(sorted_cats) + 1
+    total_w   = sum(withdrawals.values())
+    total_d   = sum(deposits.values())
     total_net = total_d - total_w
-    total_cnt = sum(d["count"]       for d in summary.values())
+    total_cnt = sum(counts.values())
 
-    for col_idx, val in enumerate(
-        ["TOTAL", float(total_w), float(total_d), float(total_net), total_cnt], start=1
-    ):
-        cell = ws.cell(row=total_row, column=col_idx, value=val)
-        cell.fill = GRAND_FILL
-        cell.font = GRAND_FONT
-        if col_idx in (2, 3, 4):
-            cell.number_format = CURRENCY_FMT
-        cell.alignment = Alignment(horizontal="center" if col_idx in (1, 5) else "right")
+    grand_center   = _fmt(wb, GRAND_FILL, GRAND_FONT, ALIGN_CENTER)
+    grand_currency = _fmt(wb, GRAND_FILL, GRAND_FONT, CURRENCY_FMT, ALIGN_RIGHT)
 
+    ws.write_string(total_row, 0, "TOTAL",          grand_center)
+    ws.write_number(total_row, 1, total_w / 100,    grand_currency)
+    ws.write_number(total_row, 2, total_d / 100,    grand_currency)
+    ws.write_number(total_row, 3, total_net / 100,  grand_currency)
+    ws.write_number(total_row, 4, total_cnt,        grand_center)
 
-# ─── MAIN EXPORT ENTRY POINT ──────────────────────────────────────────────────
 
-import io as _io
+# ─── MAIN EXPORT ENTRY POINT ──────────────────────────────────────────────────
 
-def export(transactions: List[Transaction], output_path=None) -> bytes:
+def export(transactions: Iterable[Transaction], output_path=None) -> io.BytesIO:
     """
     Write transactions to an Excel workbook.
 
+    The transactions are consumed in a single pass: the summary is tallied
+    while the transaction rows are written, so any iterable (e.g. a lazy
+    merge of several statements) works without being materialized first.
+
     Args:
-        transactions: list of Transaction objects
-        output_path:  optional Path to save to disk; if None, returns raw bytes only
+        transactions: Transaction objects, in the order they should appear
+        output_path:  optional Path to also save the workbook to disk
 
     Returns:
-        Raw Excel bytes (always)
+        BytesIO holding the workbook, rewound to the start
     """
-    wb = openpyxl.Workbook()
-    write_transactions_sheet(wb, transactions)
-    write_summary_sheet(wb, transactions)
+    buf = io.BytesIO()
 
-    buf = _io.BytesIO()
-    wb.save(buf)
-    raw_bytes = buf.getvalue()
+    # constant_memory flushes each row as soon as the next one starts instead
+    # of holding every cell until close(). in_memory would override it, so the
+    # row data goes through xlsxwriter's temp files and only the zip is in buf.
+    wb = xlsxwriter.Workbook(buf, {"constant_memory": True})
+    totals = CategoryTotals()
+    write_transactions_sheet(wb, totals.tally(transactions))
+    write_summary_sheet(wb, totals)
+    wb.close()
 
     if output_path is not None:
         with open(output_path, "wb") as f:
-            f.write(raw_bytes)
+            f.write(buf.getbuffer())
 
-    return raw_bytes
+    buf.seek(0)
+    return buf
@@ -3,9 +3,11 @@ parse_statements.py
 -------------------
 Parses RBC Advantage Banking PDF statements into a list of Transaction objects.
 
-Strategy: use pdfplumber's extract_table() with explicit vertical column separators
-derived by locating the exact x-positions of the header words on each page.
-This is far more robust than word-level bucketing.
+Strategy: locate the table's header row on each page and derive the column
+separators from the exact x-positions of its header words. The page's words are
+then bucketed into table rows by y-position and into columns by x-position
+against those separators. With FAST_TABLE_EXTRACTION = False, pdfplumber's
+extract_table() is used instead, with the separators as explicit vertical lines.
 
 Primary API for backend use:
     parse_from_bytes(pdf_bytes: bytes, filename: str) -> List[Transaction]
@@ -13,10 +15,14 @@ Primary API for backend use:
 
 import re
 import logging
+from bisect import bisect_right
+from collections import defaultdict
 from pathlib import Path
 from datetime import date
 from decimal import Decimal
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
 from typing import Optional, List
 
 import io
@@ -38,6 +44,21 @@ MONTH_MAP = {
 # Separators define: | date | description | withdrawal | deposit | balance |
 COL_SEPARATORS = [0, 55, 290, 390, 480, 620]
 
+# Transaction tables never run past page 4; page 5 is boilerplate only
+MAX_TABLE_PAGES = 4
+
+# 1-based page numbers handed to pdfplumber.open(pages=...), so objects for
+# the pages after the table are never created
+TABLE_PAGES = list(range(1, MAX_TABLE_PAGES + 1))
+
+# Build table rows directly from the page's words (fast path). Set to False to
+# fall back to pdfplumber's extract_table() with explicit column separators.
+FAST_TABLE_EXTRACTION = True
+
+# Words whose tops are within this many points belong to the same text line
+# (mirrors extract_table's text_y_tolerance)
+LINE_Y_TOLERANCE = 3
+
 # Lines containing these strings signal end of the transaction table
 FOOTER_MARKERS = [
     "Important information",
@@ -122,28 +143,54 @@ CATEGORY_RULES = [
 
 # ─── DATA CLASSES ─────────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class RawRow:
     raw_date:       str = ""
-    raw_desc:       str = ""   # full description — may span multiple PDF lines
+    raw_desc_parts: List[str] = field(default_factory=list)   # one per PDF line
     raw_withdrawal: str = ""
     raw_deposit:    str = ""
     raw_balance:    str = ""
     page_num:       int = 0
 
+    @property
+    def raw_desc(self) -> str:
+        """Full description: the PDF lines joined with ' — '."""
+        return " — ".join(self.raw_desc_parts)
 
-@dataclass
+
+@dataclass(slots=True)
 class Transaction:
     date:             date
     description:      str        # full description (type line + merchant joined)
     type_line:        str        # transaction type (first description line)
     merchant:         str        # merchant name (second description line), may be ""
     direction:        str        # "Withdrawal" or "Deposit"
-    amount:           Decimal
-    balance:          Optional[Decimal]
+    amount_cents:     int        # amounts are whole cents: exact, and cheap as ints
+    balance_cents:    Optional[int]
     category:         str
     statement_period: str
 
+    @property
+    def amount(self) -> Decimal:
+        return Decimal(self.amount_cents).scaleb(-2)
+
+    @property
+    def balance(self) -> Optional[Decimal]:
+        if self.balance_cents is None:
+            return None
+        return Decimal(self.balance_cents).scaleb(-2)
+
+    def as_tuple(self) -> tuple:
+        """
+        Field values as plain built-ins, in declaration order: the date as an
+        ISO string, amounts as int cents. Cheap for JSON/CSV writers to emit.
+        """
+        return (
+            self.date.isoformat(), self.description, self.type_line, self.merchant,
+            self.direction, self.amount_cents, self.balance_cents, self.category,
+            self.statement_period,
+        )
+
 
 # ─── REGEX ────────────────────────────────────────────────────────────────────
 
@@ -153,67 +200,100 @@ _DATE_RE = re.compile(r'^(\d{1,2})\s*([A-Za-z]{3})$')
 # Trailing decimal amount at end of string (e.g. "Investment WS 30.00")
 _TRAILING_AMOUNT_RE = re.compile(r'^(.*\S)\s+(\d{1,3}(?:,\d{3})*\.\d{2})$')
 
-# Standalone decimal number (amount only, no text)
-_AMOUNT_ONLY_RE = re.compile(r'^\d{1,3}(?:,\d{3})*\.\d{2}$')
+# Currency symbols, thousands separators and whitespace stripped from amounts
+_AMOUNT_STRIP_RE = re.compile(r"[$,\s]")
+
+# A cleaned amount: dollars and exactly two decimals (e.g. "1234.56")
+_CENTS_RE = re.compile(r'^-?\d+\.\d{2}$')
+
+# Keyword lists folded into single alternations, so each check is one C-level
+# scan instead of a Python loop of substring tests
+_DEPOSIT_RE    = re.compile("|".join(map(re.escape, DEPOSIT_DESCRIPTIONS)))
+_WITHDRAWAL_RE = re.compile("|".join(map(re.escape, WITHDRAWAL_DESCRIPTIONS)))
+_TXN_START_RE  = re.compile("|".join(map(re.escape, TRANSACTION_TYPE_STARTS)))
+_SKIP_ROW_RE   = re.compile("|".join(map(re.escape, sorted(SKIP_ROW_TEXTS))))
+
+# Footer words (lowercased, spaces removed) that mark the end of the table
+_FOOTER_RE = re.compile("|".join([
+    "importantinformation", "important", "protectyour", "closingbalance",
+    "closing", "stayinformed", "pleasecheck", "registeredtrade",
+]))
+
+# Every CATEGORY_RULES keyword → index of the first rule listing it
+_CATEGORY_RULE_INDEX = {
+    kw: idx
+    for idx, (_, keywords) in reversed(list(enumerate(CATEGORY_RULES)))
+    for kw in keywords
+}
+
+# One scan for all category keywords. The zero-width lookahead reports a match
+# at every position (overlaps included), and alternatives are listed in rule
+# order, so the lowest rule index among the matches is the first-match-wins rule.
+_CATEGORY_RE = re.compile(
+    "(?=("
+    + "|".join(map(re.escape, sorted(_CATEGORY_RULE_INDEX, key=_CATEGORY_RULE_INDEX.get)))
+    + "))"
+)
 
 
 # ─── TABLE EXTRACTION ─────────────────────────────────────────────────────────
 
-def find_table_bbox(page) -> Optional[tuple]:
+def _group_by_y(words: List[dict]) -> List[list]:
+    """
+    Group words into lines by approximate y-position (2pt buckets).
+    Returns the lines top to bottom.
+    """
+    lines: dict[int, list] = defaultdict(list)
+    for w in words:
+        lines[round(w["top"] / 2) * 2].append(w)
+    return [lines[y] for y in sorted(lines)]
+
+
+def find_header_line(lines: List[list]) -> Optional[list]:
+    """
+    Return the words of the table's header row, or None if the page has none.
+
+    Takes the page's _group_by_y() lines; the header row contains both
+    "Date" and "Description" (or "Withdrawals"). extract_table_rows finds it
+    once and shares it with find_table_bbox and find_col_separators.
+    """
+    for line_words in lines:
+        texts = [w["text"] for w in line_words]
+        if any("Date" in t for t in texts) and \
+           any("Withdrawal" in t or "Description" in t for t in texts):
+            return line_words
+    return None
+
+
+def find_table_bbox(page, words: List[dict], header: Optional[list]) -> Optional[tuple]:
     """
     Find the bounding box of the transaction table on a page.
     Returns (x0, top, x1, bottom) or None if no table found.
 
     Strategy:
-    - Top edge: y-position of the header row containing 'Date' + 'Description'
+    - Top edge: y-position of the header row (from find_header_line)
     - Bottom edge: y-position of the first footer marker, or page bottom
     """
-    # Use tight x_tolerance=2 to avoid merging column header words together
-    words = page.extract_words(x_tolerance=2, y_tolerance=3)
-    if not words:
+    if not words or header is None:
         return None
 
-    table_top    = None
+    # Use the minimum top of words on the header line
+    table_top    = min(w["top"] for w in header)
     table_bottom = page.height
 
-    # Group words by approximate y-position to find the header row
-    from collections import defaultdict
-    lines: dict[int, list] = defaultdict(list)
-    for w in words:
-        bucket = round(w["top"] / 2) * 2   # 2pt buckets
-        lines[bucket].append(w)
-
-    for y_bucket in sorted(lines):
-        line_words = lines[y_bucket]
-        texts = [w["text"] for w in line_words]
-        joined = " ".join(texts)
-        # Header row contains both "Date" and "Description" (or "Withdrawals")
-        if ("Date" in texts or any("Date" in t for t in texts)) and \
-           any("Withdrawal" in t or "Description" in t for t in texts):
-            # Use the minimum top of words on this line
-            table_top = min(w["top"] for w in line_words)
-            break
-
-    if table_top is None:
-        return None
-
     # Find footer boundary
-    footer_keywords = [
-        "importantinformation", "important", "protectyour", "closingbalance",
-        "closing", "stayinformed", "pleasecheck", "registeredtrade"
-    ]
     for w in words:
         if w["top"] <= table_top:
             continue
-        text_lower = w["text"].lower().replace(" ", "")
-        if any(kw in text_lower for kw in footer_keywords):
+        # extract_words() splits on spaces, so word text never contains one
+        if _FOOTER_RE.search(w["text"].lower()):
             table_bottom = w["top"]
             break
 
     return (0, table_top, page.width, table_bottom)
 
 
-def find_col_separators(page) -> List[float]:
+def find_col_separators(page, header: Optional[list]) -> List[float]:
     """
     Locate the exact x-positions of column separators from the header row.
     Falls back to hardcoded COL_SEPARATORS if header not found.
@@ -221,42 +301,24 @@ def find_col_separators(page) -> List[float]:
     RBC columns: Date | Description | Withdrawals | Deposits | Balance
     We use the LEFT edge of each header word as the column separator.
     """
-    words = page.extract_words(x_tolerance=2, y_tolerance=3)
-
-    header_y = None
-    date_x = desc_x = with_x = dep_x = bal_x = None
-
-    # Find the header row — look for a line containing both "Date" and "Description"
-    from collections import defaultdict
-    lines: dict[int, list] = defaultdict(list)
-    for w in words:
-        bucket = round(w["top"] / 2) * 2
-        lines[bucket].append(w)
-
-    for y_bucket in sorted(lines):
-        line_words = lines[y_bucket]
-        texts = [w["text"] for w in line_words]
-        if any("Date" in t for t in texts) and \
-           any("Withdrawal" in t or "Description" in t for t in texts):
-            header_y = min(w["top"] for w in line_words)
-            for w in line_words:
-                t = w["text"]
-                if "Date" in t and w["x0"] < 60:
-                    date_x = w["x0"]
-                if "Description" in t:
-                    desc_x = w["x0"]
-                if "Withdrawal" in t:
-                    with_x = w["x0"]
-                if "Deposit" in t and "e-Transfer" not in t:
-                    dep_x = w["x0"]
-                if "Balance" in t:
-                    bal_x = w["x0"]
-            break
-
-    if header_y is None:
+    if header is None:
         log.debug("Header row not found — using hardcoded separators")
         return COL_SEPARATORS
 
+    date_x = desc_x = with_x = dep_x = bal_x = None
+    for w in header:
+        t = w["text"]
+        if "Date" in t and w["x0"] < 60:
+            date_x = w["x0"]
+        if "Description" in t:
+            desc_x = w["x0"]
+        if "Withdrawal" in t:
+            with_x = w["x0"]
+        if "Deposit" in t and "e-Transfer" not in t:
+            dep_x = w["x0"]
+        if "Balance" in t:
+            bal_x = w["x0"]
+
     if all(v is not None for v in [date_x, desc_x, with_x, dep_x, bal_x]):
         separators = sorted([0, date_x, desc_x, with_x, dep_x, bal_x, page.width])
         log.debug(f"Detected separators: {separators}")
@@ -271,15 +333,96 @@ def extract_table_rows(page, page_num: int) -> List[dict]:
     Extract raw table rows from a page as a list of dicts with keys:
     date, desc, withdrawal, deposit, balance.
 
-    Uses pdfplumber's extract_table() with explicit vertical separators.
+    Locates the table and its column separators from the header row, then
+    buckets words into rows and columns directly (FAST_TABLE_EXTRACTION), or
+    uses pdfplumber's extract_table() with explicit vertical separators.
     """
-    bbox = find_table_bbox(page)
+    # Cheap pre-check on the raw chars: without the header words the page has
+    # no table (e.g. boilerplate pages), so skip word extraction entirely
+    page_text = "".join(c["text"] for c in page.chars)
+    if "Date" not in page_text or \
+       ("Description" not in page_text and "Withdrawal" not in page_text):
+        log.debug(f"Page {page_num}: no table header text — skipping")
+        return []
+
+    # Word extraction walks every char on the page — do it once and share it.
+    # Tight x_tolerance=2 avoids merging column header words together.
+    words  = page.extract_words(x_tolerance=2, y_tolerance=3)
+    header = find_header_line(_group_by_y(words))
+
+    bbox = find_table_bbox(page, words, header)
     if bbox is None:
         log.debug(f"Page {page_num}: no table found")
         return []
 
-    separators = find_col_separators(page)
+    separators = find_col_separators(page, header)
+
+    if FAST_TABLE_EXTRACTION:
+        return _rows_from_words(words, bbox, separators, page_num)
+    return _rows_from_extract_table(page, bbox, separators, page_num)
+
+
+def _make_row(cells: List[str], page_num: int) -> dict:
+    # [date, description, withdrawal, deposit, balance], matched by position
+    date_cell, desc_cell, with_cell, dep_cell, bal_cell = cells[:5]
+    return {
+        "date":       date_cell,
+        "desc":       desc_cell,
+        "withdrawal": with_cell,
+        "deposit":    dep_cell,
+        "balance":    bal_cell,
+        "page_num":   page_num,
+    }
+
+
+def _rows_from_words(words: List[dict], bbox: tuple, separators: List[float],
+                     page_num: int) -> List[dict]:
+    """
+    Build table rows straight from the page's words: one row per text line,
+    each word assigned to a column by its left edge.
+
+    The RBC layout is fixed, so this skips extract_table()'s edge and
+    intersection finding. It also cuts only on the inner separators, which
+    is why it finds balances when extract_table() does not. With
+    horizontal_strategy="text", extract_table()'s horizontal edges only span
+    the leftmost to rightmost word, so the outer separators (0 and the page
+    width, or 620 in COL_SEPARATORS) never cross one. It builds no cells
+    before the first crossed separator or after the last. With detected
+    separators that always leaves the balance column empty. With the
+    hard-coded fallback it drops the date column as well.
+    """
+    _, table_top, _, table_bottom = bbox
+
+    # Inner boundaries between the five columns. The outermost separators are
+    # the page edges (detected) or the balance column's right edge (hardcoded).
+    cuts = separators[-5:-1]
+
+    in_table = sorted(
+        (w for w in words if w["top"] >= table_top and w["bottom"] <= table_bottom),
+        key=lambda w: w["top"],
+    )
+
+    rows = []
+    line: List[dict] = []
+    line_top = None
+    for w in in_table + [None]:
+        if w is not None and line_top is not None and w["top"] - line_top <= LINE_Y_TOLERANCE:
+            line.append(w)
+            continue
+        if line:
+            cells: List[List[str]] = [[], [], [], [], []]
+            for lw in sorted(line, key=lambda lw: lw["x0"]):
+                cells[bisect_right(cuts, lw["x0"])].append(lw["text"])
+            rows.append(_make_row([" ".join(c) for c in cells], page_num))
+        if w is not None:
+            line, line_top = [w], w["top"]
+
+    return rows
 
+
+def _rows_from_extract_table(page, bbox: tuple, separators: List[float],
+                             page_num: int) -> List[dict]:
+    """Table rows via pdfplumber's extract_table() with explicit vertical separators."""
     # Crop to table area
     cropped = page.within_bbox(bbox)
 
@@ -321,20 +464,7 @@ def extract_table_rows(page, page_num: int) -> List[dict]:
         while len(cells) < 5:
             cells.append("")
 
-        date_cell = cells[0]
-        desc_cell = cells[1]
-        with_cell = cells[2]
-        dep_cell  = cells[3]
-        bal_cell  = cells[4]
-
-        rows.append({
-            "date":       date_cell,
-            "desc":       desc_cell,
-            "withdrawal": with_cell,
-            "deposit":    dep_cell,
-            "balance":    bal_cell,
-            "page_num":   page_num,
-        })
+        rows.append(_make_row(cells, page_num))
 
     return rows
 
@@ -363,33 +493,34 @@ def is_skip_row(date_cell: str, desc_cell: str) -> bool:
     combined = (date_cell + " " + desc_cell).lower().strip()
     if not combined:
         return True
-    for skip in SKIP_ROW_TEXTS:
-        if skip in combined:
-            return True
+    if _SKIP_ROW_RE.search(combined):
+        return True
     # Header row: contains "description" or "withdrawals"
     if "withdrawals" in combined or ("date" in combined and "description" in combined):
         return True
     return False
 
 
-def is_new_transaction(date_cell: str, desc_cell: str,
+def is_new_transaction(has_date: bool, desc_lower: str,
                         with_cell: str, dep_cell: str) -> bool:
     """
     True if this row starts a new transaction.
     - Has a valid date, OR
     - Description starts with a known transaction type keyword, OR
     - Has an amount and description's first word isn't a pure merchant name
+
+    Takes cleaned cells with the date already validated and the description
+    already lowercased, as computed once per row by assemble_raw_rows.
     """
-    if is_valid_date(date_cell):
+    if has_date:
         return True
 
-    desc_lower = desc_cell.lower().strip()
-    if any(desc_lower.startswith(kw) for kw in TRANSACTION_TYPE_STARTS):
+    if _TXN_START_RE.match(desc_lower):
         return True
 
-    has_amount = bool(with_cell.strip() or dep_cell.strip())
+    has_amount = bool(with_cell or dep_cell)
     if has_amount and desc_lower:
-        first_word = desc_lower.split()[0]
+        first_word = desc_lower.split(None, 1)[0]   # only the first token is needed
         if first_word not in MERCHANT_ONLY_FIRST_WORDS:
             return True
 
@@ -402,8 +533,8 @@ def assemble_raw_rows(table_rows: List[dict]) -> List[RawRow]:
     """
     Merge multi-line table rows into single RawRow objects.
 
-    pdfplumber's horizontal_strategy="text" creates one row per text line,
-    so a two-line transaction (type + merchant) appears as two consecutive rows.
+    extract_table_rows yields one row per text line, so a two-line
+    transaction (type + merchant) appears as two consecutive rows.
     We merge them here.
     """
     raw_rows: List[RawRow] = []
@@ -417,42 +548,48 @@ def assemble_raw_rows(table_rows: List[dict]) -> List[RawRow]:
         bal_cell  = clean_amount(r["balance"])
         page_num  = r["page_num"]
 
+        # Pure balance-only row (a balance printed on its own line) — attach
+        # to current. Checked first: is_skip_row treats any row with no date
+        # and no description as blank.
+        if bal_cell and not (desc_cell or with_cell or dep_cell) and \
+           not (date_cell and is_valid_date(date_cell)):
+            if current and not current.raw_balance:
+                current.raw_balance = bal_cell
+            continue
+
         # Skip header/footer/blank rows
         if is_skip_row(date_cell, desc_cell):
             continue
 
-        # Reject barcodes/serials in date column
+        # Reject barcodes/serials in date column; from here a non-empty
+        # date_cell is a valid date
         if date_cell and not is_valid_date(date_cell):
             date_cell = ""
 
+        desc_lower = desc_cell.lower()
+
         # Handle embedded amounts in description (pdfplumber table quirk)
         if desc_cell and not with_cell and not dep_cell:
             m = _TRAILING_AMOUNT_RE.match(desc_cell)
             if m:
-                desc_cell = m.group(1).strip()
-                amt_str   = m.group(2)
+                desc_cell  = m.group(1).strip()
                 desc_lower = desc_cell.lower()
-                if any(kw in desc_lower for kw in DEPOSIT_DESCRIPTIONS):
+                amt_str    = m.group(2)
+                if _DEPOSIT_RE.search(desc_lower):
                     dep_cell  = amt_str
                 else:
                     with_cell = amt_str
 
-        # Pure balance-only row — attach to current
-        if bal_cell and not desc_cell and not with_cell and not dep_cell and not date_cell:
-            if current and not current.raw_balance:
-                current.raw_balance = bal_cell
-            continue
-
         # Fully empty row
-        if not any([date_cell, desc_cell, with_cell, dep_cell, bal_cell]):
+        if not (date_cell or desc_cell or with_cell or dep_cell or bal_cell):
             continue
 
-        if is_new_transaction(date_cell, desc_cell, with_cell, dep_cell):
+        if is_new_transaction(bool(date_cell), desc_lower, with_cell, dep_cell):
             if current:
                 raw_rows.append(current)
             current = RawRow(
                 raw_date       = date_cell,
-                raw_desc       = desc_cell,
+                raw_desc_parts = [desc_cell] if desc_cell else [],
                 raw_withdrawal = with_cell,
                 raw_deposit    = dep_cell,
                 raw_balance    = bal_cell,
@@ -462,10 +599,7 @@ def assemble_raw_rows(table_rows: List[dict]) -> List[RawRow]:
             # Continuation line — append to current description (merchant name)
             if current:
                 if desc_cell:
-                    if current.raw_desc:
-                        current.raw_desc = current.raw_desc + " — " + desc_cell
-                    else:
-                        current.raw_desc = desc_cell
+                    current.raw_desc_parts.append(desc_cell)
                 if with_cell and not current.raw_withdrawal:
                     current.raw_withdrawal = with_cell
                 if dep_cell and not current.raw_deposit:
@@ -486,17 +620,22 @@ def fill_dates(raw_rows: List[RawRow], year_map: dict) -> List[Optional[date]]:
     resolved: List[Optional[date]] = []
     last_date: Optional[date] = None
 
+    # Month abbreviation → (year, month), so each row is a single lookup
+    year_month = {
+        mon: (year, MONTH_MAP[mon])
+        for mon, year in year_map.items()
+        if year and mon in MONTH_MAP
+    }
+
     for row in raw_rows:
         if row.raw_date:
-            m = _DATE_RE.match(row.raw_date.strip())
+            m = _DATE_RE.match(row.raw_date)   # cells are already stripped
             if m:
-                day_str   = m.group(1)
-                month_str = m.group(2)[:3].capitalize()
-                year  = year_map.get(month_str)
-                month = MONTH_MAP.get(month_str)
-                if year and month:
+                # _DATE_RE captures exactly three letters
+                ym = year_month.get(m.group(2).capitalize())
+                if ym:
                     try:
-                        last_date = date(year, month, int(day_str))
+                        last_date = date(ym[0], ym[1], int(m.group(1)))
                     except ValueError:
                         log.warning(f"Invalid date: {row.raw_date!r}")
         resolved.append(last_date)
@@ -521,27 +660,26 @@ def resolve_direction(raw_desc: str, raw_w: str, raw_d: str) -> str:
 
     # Neither: fall back to keywords
     desc_lower = raw_desc.lower()
-    if any(kw in desc_lower for kw in DEPOSIT_DESCRIPTIONS):
+    if _DEPOSIT_RE.search(desc_lower):
         return "Deposit"
-    if any(kw in desc_lower for kw in WITHDRAWAL_DESCRIPTIONS):
+    if _WITHDRAWAL_RE.search(desc_lower):
         return "Withdrawal"
 
     log.warning(f"Cannot determine direction for: {raw_desc!r} — defaulting to Withdrawal")
     return "Withdrawal"
 
 
-def parse_amount(raw: str) -> Optional[Decimal]:
-    """Parse '1,234.56' or '$1,234.56' → Decimal."""
+def parse_amount(raw: str) -> Optional[int]:
+    """Parse '1,234.56' or '$1,234.56' → 123456 (cents)."""
     if not raw:
         return None
-    cleaned = re.sub(r"[$,\s]", "", raw)
+    cleaned = _AMOUNT_STRIP_RE.sub("", raw)
     if not cleaned:
         return None
-    try:
-        return Decimal(cleaned)
-    except Exception:
+    if not _CENTS_RE.match(cleaned):
         log.warning(f"Could not parse amount: {raw!r}")
         return None
+    return int(cleaned.replace(".", ""))
 
 
 # ─── CATEGORIZATION ───────────────────────────────────────────────────────────
@@ -554,13 +692,14 @@ def categorize(description: str, direction: str) -> str:
     if "online banking transfer" in desc_lower or "online transfer to deposit" in desc_lower:
         return "Transfers Out" if direction == "Withdrawal" else "Transfers In"
 
-    for category, keywords in CATEGORY_RULES:
-        if not keywords:
-            return category
-        if any(kw in desc_lower for kw in keywords):
-            return category
+    rule_idx = min(
+        (_CATEGORY_RULE_INDEX[m.group(1)] for m in _CATEGORY_RE.finditer(desc_lower)),
+        default=None,
+    )
+    if rule_idx is not None:
+        return CATEGORY_RULES[rule_idx][0]
 
-    return "Other"
+    return "Other"   # catch-all: the final CATEGORY_RULES entry has no keywords
 
 
 # ─── TRANSACTION ASSEMBLY ─────────────────────────────────────────────────────
@@ -584,37 +723,38 @@ def build_transactions(
     transactions = []
 
     for row, resolved_date in zip(raw_rows, resolved_dates):
+        raw_desc = row.raw_desc
         if resolved_date is None:
-            log.warning(f"Skipping row with no date: {row.raw_desc!r}")
+            log.warning(f"Skipping row with no date: {raw_desc!r}")
             continue
 
-        direction = resolve_direction(row.raw_desc, row.raw_withdrawal, row.raw_deposit)
+        direction = resolve_direction(raw_desc, row.raw_withdrawal, row.raw_deposit)
         raw_amount = row.raw_withdrawal if direction == "Withdrawal" else row.raw_deposit
         amount = parse_amount(raw_amount)
 
         if amount is None:
             log.warning(
-                f"Skipping — no amount: desc={row.raw_desc!r} "
+                f"Skipping — no amount: desc={raw_desc!r} "
                 f"w={row.raw_withdrawal!r} d={row.raw_deposit!r} "
                 f"on {resolved_date} (page {row.page_num})"
             )
             continue
 
         if amount <= 0:
-            log.warning(f"Skipping non-positive amount {amount}: {row.raw_desc!r}")
+            log.warning(f"Skipping non-positive amount {raw_amount!r}: {raw_desc!r}")
             continue
 
-        type_line, merchant = split_description(row.raw_desc)
+        type_line, merchant = split_description(raw_desc)
 
         t = Transaction(
             date             = resolved_date,
-            description      = row.raw_desc,
+            description      = raw_desc,
             type_line        = type_line,
             merchant         = merchant,
             direction        = direction,
-            amount           = amount,
-            balance          = parse_amount(row.raw_balance),
-            category         = categorize(row.raw_desc, direction),
+            amount_cents     = amount,
+            balance_cents    = parse_amount(row.raw_balance),
+            category         = categorize(raw_desc, direction),
             statement_period = period,
         )
         transactions.append(t)
@@ -636,7 +776,7 @@ def validate(transactions: List[Transaction]) -> bool:
         issues.append(f"Jan–Feb count {len(jan_feb)} outside expected range 45–90")
 
     for i, t in enumerate(transactions):
-        if t.amount is None or t.amount <= 0:
+        if t.amount_cents is None or t.amount_cents <= 0:
             issues.append(f"Row {i} ({t.date}): bad amount {t.amount} — {t.type_line!r}")
 
     for label, group in [("Dec–Jan", dec_jan), ("Jan–Feb", jan_feb)]:
@@ -663,59 +803,99 @@ _PERIOD_RE = re.compile(
     re.IGNORECASE
 )
 
-def detect_year_map(pdf) -> tuple[dict, str]:
+def detect_year_map(first_page_text: str) -> tuple[dict, str]:
     """
-    Read the first page of an open pdfplumber PDF to detect the statement period.
-    Returns (year_map, period_label).
+    Detect the statement period from the text of the statement's first page
+    (see _first_page_text). Returns (year_map, period_label).
     Falls back to current year if detection fails.
     """
     from datetime import datetime
     current_year = datetime.now().year
 
-    try:
-        first_page_text = pdf.pages[0].extract_text() or ""
-        m = _PERIOD_RE.search(first_page_text)
-        if m:
-            start_month = m.group(1)[:3].capitalize()
-            start_year  = int(m.group(2))
-            end_month   = m.group(3)[:3].capitalize()
-            end_year    = int(m.group(4))
-
-            year_map = {start_month: start_year, end_month: end_year}
-            period   = f"{start_month} {start_year} – {end_month} {end_year}"
-            log.info(f"Detected period: {period}")
-            return year_map, period
-    except Exception as e:
-        log.warning(f"Period detection failed: {e}")
+    m = _PERIOD_RE.search(first_page_text)
+    if m:
+        start_month = m.group(1)[:3].capitalize()
+        start_year  = int(m.group(2))
+        end_month   = m.group(3)[:3].capitalize()
+        end_year    = int(m.group(4))
 
+        year_map = {start_month: start_year, end_month: end_year}
+        period   = f"{start_month} {start_year} – {end_month} {end_year}"
+        log.info(f"Detected period: {period}")
+        return year_map, period
+
+    log.warning("Period detection failed: no statement period on first page")
     fallback_year_map = {m: current_year for m in MONTH_MAP}
     return fallback_year_map, f"Unknown {current_year}"
 
 
+def _first_page_text(pdf) -> str:
+    """
+    Text of the open PDF's first page, for detect_year_map. A page that
+    can't be rendered to text yields "", so detection falls back to the
+    current year rather than failing the whole file.
+    """
+    if not pdf.pages:
+        return ""
+    try:
+        return pdf.pages[0].extract_text() or ""
+    except Exception as e:
+        log.warning(f"Period detection failed: {e}")
+        return ""
+
+
 # ─── MAIN PARSE ENTRY POINTS ──────────────────────────────────────────────────
 
-def parse_from_bytes(pdf_bytes: bytes, filename: str = "statement.pdf") -> List[Transaction]:
+def _extract_page(pdf_bytes: bytes, page_num: int) -> List[dict]:
+    """Worker entry point: open the PDF and extract the table rows of one page."""
+    with pdfplumber.open(io.BytesIO(pdf_bytes), pages=[page_num]) as pdf:
+        return extract_table_rows(pdf.pages[0], page_num)
+
+
+def _extract_all_pages(pdf, pdf_bytes: bytes, page_workers: int) -> List[dict]:
+    """
+    Table rows of every page of the open pdf, in page order.
+
+    With page_workers > 1 the pages are spread across worker processes, each
+    re-opening the PDF from pdf_bytes; map() keeps page order. A PDF with at
+    most one page is always extracted serially.
+    """
+    page_count = len(pdf.pages)
+    all_table_rows = []
+
+    if page_workers <= 1 or page_count <= 1:
+        for page_num, page in enumerate(pdf.pages, start=1):
+            rows = extract_table_rows(page, page_num)
+            all_table_rows.extend(rows)
+            page.close()   # drop the page's cached layout objects
+        return all_table_rows
+
+    with ProcessPoolExecutor(max_workers=min(page_workers, page_count)) as pool:
+        for rows in pool.map(_extract_page, repeat(pdf_bytes), range(1, page_count + 1)):
+            all_table_rows.extend(rows)
+    return all_table_rows
+
+
+def parse_from_bytes(pdf_bytes: bytes, filename: str = "statement.pdf",
+                     page_workers: int = 1) -> List[Transaction]:
     """
     Parse a single PDF statement from raw bytes.
     This is the primary entry point for the backend API.
 
     Args:
-        pdf_bytes: Raw PDF file content
-        filename:  Original filename (used only for logging)
+        pdf_bytes:    Raw PDF file content
+        filename:     Original filename (used only for logging)
+        page_workers: Processes to spread the table pages across. Page
+                      extraction is CPU-bound and independent per page; the
+                      default of 1 extracts serially, which suits callers
+                      that already run one parse per worker process.
 
     Returns:
         List of Transaction objects
     """
-    all_table_rows = []
-
-    with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-        year_map, period = detect_year_map(pdf)
-
-        for page_num, page in enumerate(pdf.pages, start=1):
-            if page_num >= 5:   # page 5 is boilerplate only
-                break
-            rows = extract_table_rows(page, page_num)
-            all_table_rows.extend(rows)
+    with pdfplumber.open(io.BytesIO(pdf_bytes), pages=TABLE_PAGES) as pdf:
+        year_map, period = detect_year_map(_first_page_text(pdf))
+        all_table_rows   = _extract_all_pages(pdf, pdf_bytes, page_workers)
 
     raw_rows       = assemble_raw_rows(all_table_rows)
     resolved_dates = fill_dates(raw_rows, year_map)
@@ -725,16 +905,16 @@ def parse_from_bytes(pdf_bytes: bytes, filename: str = "statement.pdf") -> List[
     return transactions
 
 
-def parse_from_path(path: Path, year_map: dict, period: str) -> List[Transaction]:
-    """Parse a PDF from a file path. Used by the local CLI (main.py)."""
-    all_table_rows = []
-
-    with pdfplumber.open(path) as pdf:
-        for page_num, page in enumerate(pdf.pages, start=1):
-            if page_num >= 5:
-                break
-            rows = extract_table_rows(page, page_num)
-            all_table_rows.extend(rows)
+def parse_from_path(path: Path, year_map: dict, period: str,
+                    page_workers: int = 1) -> List[Transaction]:
+    """
+    Parse a PDF from a file path. Used by the local CLI (main.py).
+    page_workers is as for parse_from_bytes.
+    """
+    # Parsing from an in-memory buffer avoids pdfminer's many small file reads
+    pdf_bytes = path.read_bytes()
+    with pdfplumber.open(io.BytesIO(pdf_bytes), pages=TABLE_PAGES) as pdf:
+        all_table_rows = _extract_all_pages(pdf, pdf_bytes, page_workers)
 
     raw_rows       = assemble_raw_rows(all_table_rows)
     resolved_dates = fill_dates(raw_rows, year_map)